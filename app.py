@@ -1,47 +1,188 @@
+import hashlib
 import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables FIRST
 load_dotenv()
 
-from flask import Flask, render_template, request
-from services.quai_api import QuaiAPI
+from flask import Flask, make_response, render_template, request
+from flask_caching import Cache, CachedResponse
+from services.quai_api import QuaiAPI, REORG_SAFE_DEPTH, to_int
 from services.db import DatabaseService
 
 app = Flask(__name__)
 
+# Rendered pages and data lookups are cached for roughly one block interval
+# (the default timeout, which the verification scripts raise); use Redis when
+# configured so every worker shares the cache, otherwise keep it in-process
+redis_url = os.getenv('REDIS_URL')
+cache = Cache(app, config={
+    'CACHE_TYPE': 'RedisCache' if redis_url else 'SimpleCache',
+    'CACHE_REDIS_URL': redis_url,
+    'CACHE_DEFAULT_TIMEOUT': 5
+}, with_jinja2_ext=True)
+
 quai_api = QuaiAPI()
 db_service = DatabaseService()
 
+# Shared pool for independent Supabase / RPC calls made within one request
+# (unused on gevent workers, where each request spawns its own greenlets)
+io_executor = ThreadPoolExecutor(max_workers=8)
+
+def _gevent_patched():
+    """Whether this worker runs on monkey-patched gevent sockets"""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('socket')
+
+def gather(*calls):
+    """Run independent zero-argument calls concurrently, returning results in order
+
+    On gevent workers every request gets its own greenlets, so one request's
+    lookups never queue behind another's; elsewhere the shared pool is used.
+    """
+    if _gevent_patched():
+        import gevent
+        jobs = [gevent.spawn(call) for call in calls]
+        gevent.joinall(jobs, raise_error=True)
+        return [job.value for job in jobs]
+    
+    futures = [io_executor.submit(call) for call in calls]
+    return [future.result() for future in futures]
+
+# Chart payload is identical for every visitor within a block, so it is
+# published once under a shared key (by `flask sync` or the first request)
+CHART_DATA_KEY = 'dashboard:chart_data'
+CHART_DATA_TIMEOUT = 5
+
+# Detail pages for final blocks never change; anything near the tip (or a
+# pending transaction) may still be reorged, so it only gets the default
+# one-block timeout
+FINAL_PAGE_TIMEOUT = 3600
+
+@lru_cache(maxsize=4096)
+def _hex_to_int(hex_str):
+    """Parse a node quantity; repeated values (hot blocks) skip the parse"""
+    return to_int(hex_str)
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(timestamp_int):
+    """Format unix seconds for display"""
+    return datetime.utcfromtimestamp(timestamp_int).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+# Display "now" has second granularity, so format it at most once per second
+_last_now_ts = [0]
+_last_now_str = ['']
+
+def now_utc_str():
+    """Current UTC time formatted for display"""
+    t = int(time.time())
+    if t != _last_now_ts[0]:
+        _last_now_str[0] = datetime.utcfromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S UTC")
+        _last_now_ts[0] = t
+    return _last_now_str[0]
+
+@cache.memoize()
+def get_latest_blocks_cached(limit, offset=0):
+    return db_service.get_latest_blocks(limit=limit, offset=offset)
+
+@cache.memoize()
+def get_latest_txs_cached(limit, offset=0):
+    return db_service.get_latest_transactions(limit=limit, offset=offset)
+
+@cache.memoize()
+def get_dashboard_snapshot_cached(block_limit, tx_limit):
+    return db_service.get_dashboard_snapshot(block_limit=block_limit, tx_limit=tx_limit)
+
+@cache.memoize()
+def get_tx_direction_counts_cached(window):
+    return db_service.get_tx_direction_counts(window=window)
+
+# Rows counted in Python when the SQL aggregate is unavailable
+DIRECTION_SAMPLE_SIZE = 50
+# Recent transactions the dashboard's SQL direction counts cover
+DIRECTION_COUNT_WINDOW = 500
+
+def get_direction_counts(window):
+    """Direction counts from SQL, or from a recent-row sample if the function is missing"""
+    direction_counts = get_tx_direction_counts_cached(window)
+    if direction_counts is None:
+        direction_counts = count_transfer_directions(get_latest_txs_cached(DIRECTION_SAMPLE_SIZE))
+    return direction_counts
+
+def render_with_etag(template, etag, **context):
+    """Render a template and tag it so repeat visitors can get a 304
+
+    Tags are weak since pages embed the render time; they identify the
+    underlying block/transaction data rather than exact bytes.
+    """
+    response = make_response(render_template(template, **context))
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+def data_etag(prefix, *data):
+    """Tag for a page built from `data`, changing whenever any of it does"""
+    digest = hashlib.blake2b(repr(data).encode(), digest_size=8).hexdigest()
+    return f"{prefix}-{digest}"
+
+def page_timeout(block_number, latest_block_num):
+    """Cache lifetime for a page showing data from `block_number` (None is the cache default)"""
+    if block_number is not None and latest_block_num and block_number <= latest_block_num - REORG_SAFE_DEPTH:
+        return FINAL_PAGE_TIMEOUT
+    return None
+
+def is_data_page(response):
+    """Cache only pages built from real block/transaction data
+
+    Views mark those by returning a CachedResponse; not-found pages,
+    placeholders and error pages are rendered fresh every time.
+    """
+    return isinstance(response, CachedResponse)
+
+@app.after_request
+def apply_conditional_get(response):
+    # Runs after the view cache, so a cached 200 is turned into a 304 per
+    # request instead of a 304 being stored in the cache
+    if request.method == 'GET' and response.get_etag()[0]:
+        response.make_conditional(request)
+    return response
+
 @app.route('/')
+@cache.cached()
 def index():
     try:
-        # Fetch latest blocks
-        latest_blocks = db_service.get_latest_blocks(limit=10)
+        # Without Supabase there is no SQL aggregate, so the counting window
+        # comes from the same block sweep as the displayed rows
+        sql_counts = db_service.supabase is not None
+        
+        # Fetch latest blocks and transactions (one block sweep), direction
+        # counts and stats concurrently
+        calls = [
+            lambda: get_dashboard_snapshot_cached(10, 10 if sql_counts else DIRECTION_SAMPLE_SIZE),
+            db_service.get_network_stats,
+        ]
+        if sql_counts:
+            calls.append(lambda: get_direction_counts(DIRECTION_COUNT_WINDOW))
+        snapshot, stats, *sql_direction_counts = gather(*calls)
         
-        # Fetch latest transactions  
-        latest_txs = db_service.get_latest_transactions(limit=50)  # Get more for chart data
+        latest_blocks = snapshot['blocks']
+        latest_txs = snapshot['transactions'][:10]
         
-        # Compute stats
-        stats = db_service.get_network_stats()
+        # Count self-transfers vs external transfers once for both insight and chart
+        if sql_direction_counts:
+            direction_counts = sql_direction_counts[0]
+        else:
+            direction_counts = count_transfer_directions(snapshot['transactions'])
+        self_transfers, external_transfers = direction_counts
         
         # Generate simple, truthful insight based on actual network activity
+        
         if latest_txs:
-            # Count self-transfers vs external transfers for network insight
-            self_transfers = 0
-            external_transfers = 0
-            
-            for tx in latest_txs:
-                from_address = tx.get('from_address')
-                to_address = tx.get('to_address')
-                
-                if from_address and to_address:
-                    if from_address.lower() == to_address.lower():
-                        self_transfers += 1
-                    else:
-                        external_transfers += 1
-            
             if external_transfers > self_transfers:
                 insight = "Recent network activity shows predominantly external transfers between different addresses."
             elif self_transfers > 0:
@@ -53,15 +194,22 @@ def index():
         
         # Add sync timestamp and insight
         stats['insight'] = insight
-        stats['last_synced'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        stats['last_synced'] = now_utc_str()
         
-        # Prepare chart data
-        chart_data = prepare_chart_data(latest_txs, latest_blocks)
+        # Reuse the published chart data for this block, building it on a miss
+        chart_data = cache.get(CHART_DATA_KEY)
+        if chart_data is None:
+            chart_data = refresh_chart_data(latest_txs, latest_blocks, self_transfers, external_transfers)
         
-        return render_template('index.html', 
+        # The tip in the stats moves independently of the stored rows, so tag
+        # everything shown except the render time
+        shown_stats = {key: value for key, value in stats.items() if key != 'last_synced'}
+        etag = data_etag('dash', shown_stats, latest_blocks, latest_txs, chart_data)
+        
+        return render_with_etag('index.html', etag,
                              stats=stats, 
                              latest_blocks=latest_blocks,
-                             latest_txs=latest_txs[:10],  # Keep only 10 for table
+                             latest_txs=latest_txs,
                              chart_data=chart_data)
     except Exception as e:
         # Fallback data in case of errors
@@ -71,7 +219,7 @@ def index():
             'active_addresses': 0,
             'network_status': 'Error',
             'insight': f'Service temporarily unavailable: {str(e)}',
-            'last_synced': datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+            'last_synced': now_utc_str()
         }
         fallback_chart_data = {
             'tx_per_block': {
@@ -89,7 +237,30 @@ def index():
                              latest_txs=[],
                              chart_data=fallback_chart_data)
 
-def prepare_chart_data(transactions, blocks):
+def count_transfer_directions(transactions):
+    """Return (self_transfers, external_transfers) in a single pass
+
+    Addresses are lowercased by DatabaseService when loaded, so they are
+    compared directly here. A plain loop is deliberate: converting the
+    address strings into NumPy/int64 arrays for a vectorized or JIT kernel
+    costs several times more than this whole pass.
+    """
+    self_transfers = 0
+    external_transfers = 0
+    
+    for tx in transactions:
+        from_address = tx.get('from_address')
+        to_address = tx.get('to_address')
+        
+        if from_address and to_address:
+            if from_address == to_address:
+                self_transfers += 1
+            else:
+                external_transfers += 1
+    
+    return self_transfers, external_transfers
+
+def prepare_chart_data(transactions, blocks, self_transfers=None, external_transfers=None):
     """Prepare simple, safe chart data"""
     
     # 1. Transactions per Block (Simple Bar Chart) - Last 10 blocks only
@@ -115,26 +286,9 @@ def prepare_chart_data(transactions, blocks):
     incoming_count = 0
     outgoing_count = 0
     
-    # Count different types of transactions to show network activity
-    self_transfers = 0
-    external_transfers = 0
-    
-    for tx in transactions:
-        from_address = tx.get('from_address')
-        to_address = tx.get('to_address')
-        
-        if from_address is None or to_address is None:
-            continue
-            
-        from_lower = from_address.lower()
-        to_lower = to_address.lower()
-        
-        if from_lower == to_lower:
-            # Self-transfers - count as balanced activity
-            self_transfers += 1
-        else:
-            # External transfers - these represent real network movement
-            external_transfers += 1
+    # Count different types of transactions unless the caller already did
+    if self_transfers is None or external_transfers is None:
+        self_transfers, external_transfers = count_transfer_directions(transactions)
     
     # Create a meaningful representation of network activity
     total_activity = len(transactions)
@@ -169,20 +323,43 @@ def prepare_chart_data(transactions, blocks):
         }
     }
 
+def refresh_chart_data(transactions, blocks, self_transfers=None, external_transfers=None):
+    """Build chart data and publish it for other requests/workers"""
+    chart_data = prepare_chart_data(transactions, blocks, self_transfers, external_transfers)
+    cache.set(CHART_DATA_KEY, chart_data, timeout=CHART_DATA_TIMEOUT)
+    return chart_data
+
+@app.cli.command('sync')
+def sync_command():
+    """Ingest latest blocks and publish fresh chart data (run once per block)"""
+    db_service.sync_reference_data()
+    
+    # Same counting window as index(), so the published chart agrees with
+    # the dashboard insight whichever of them set it last
+    sql_counts = db_service.supabase is not None
+    snapshot = db_service.get_dashboard_snapshot(
+        block_limit=10, tx_limit=10 if sql_counts else DIRECTION_SAMPLE_SIZE
+    )
+    if sql_counts:
+        self_transfers, external_transfers = get_direction_counts(DIRECTION_COUNT_WINDOW)
+    else:
+        self_transfers, external_transfers = count_transfer_directions(snapshot['transactions'])
+    refresh_chart_data(snapshot['transactions'][:10], snapshot['blocks'], self_transfers, external_transfers)
+
 @app.route('/blocks')
+@cache.cached(query_string=True)
 def blocks():
     try:
         # Get page parameter for pagination
-        page = int(request.args.get('page', 1))
+        page = max(int(request.args.get('page', 1)), 1)
         per_page = 25  # Show more blocks as requested
         
-        # Fetch blocks for current page
-        all_blocks = db_service.get_latest_blocks(limit=per_page * 2)  # Fetch more to simulate pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        blocks = all_blocks[start_idx:end_idx]
+        # Fetch only the blocks for the current page
+        blocks = get_latest_blocks_cached(per_page, (page - 1) * per_page)
         
-        return render_template('blocks.html', 
+        etag = data_etag(f"blocks-{page}", blocks) if blocks else None
+        
+        return render_with_etag('blocks.html', etag,
                              blocks=blocks, 
                              page=page)
     except Exception as e:
@@ -191,19 +368,21 @@ def blocks():
                              page=1)
 
 @app.route('/transactions')
+@cache.cached(query_string=True)
 def transactions():
     try:
         # Get page parameter for pagination
-        page = int(request.args.get('page', 1))
+        page = max(int(request.args.get('page', 1)), 1)
         per_page = 30  # Show more transactions as requested
         
-        # Fetch transactions for current page
-        all_transactions = db_service.get_latest_transactions(limit=per_page * 2)  # Fetch more to simulate pagination
-        start_idx = (page - 1) * per_page
-        end_idx = start_idx + per_page
-        txs = all_transactions[start_idx:end_idx]
+        # Fetch only the transactions for the current page
+        txs = get_latest_txs_cached(per_page, (page - 1) * per_page)
         
-        return render_template('transactions.html', 
+        # Late rows with older timestamps can reshuffle a page without
+        # changing its first row, so tag the whole page
+        etag = data_etag(f"txs-{page}", txs) if txs else None
+        
+        return render_with_etag('transactions.html', etag,
                              transactions=txs, 
                              page=page)
     except Exception as e:
@@ -212,8 +391,13 @@ def transactions():
                              page=1)
 
 @app.route('/block/<int:block_number>')
+@cache.cached(response_filter=is_data_page)
 def block_detail(block_number):
     try:
+        # The chain tip decides how long the page may be cached, and lets
+        # QuaiAPI keep the block in its cache once it is final
+        latest_block_num = quai_api.get_latest_block_number()
+        
         # ALWAYS fetch block details directly from QUAI API FIRST using eth_getBlockByNumber
         block_details = quai_api.get_block_details(block_number)
         
@@ -221,15 +405,14 @@ def block_detail(block_number):
             # Convert timestamp correctly (seconds → UTC) 
             timestamp_hex = block_details.get('timestamp', '0x0')
             try:
-                timestamp_int = int(timestamp_hex, 16)
-                timestamp = datetime.utcfromtimestamp(timestamp_int).strftime("%Y-%m-%d %H:%M:%S UTC")
+                timestamp = _format_timestamp(_hex_to_int(timestamp_hex))
             except (ValueError, TypeError):
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+                timestamp = now_utc_str()
             
             # Parse gasUsed correctly (hex → int)
             gas_used_hex = block_details.get('gasUsed', '0x0')
             try:
-                gas_used = int(gas_used_hex, 16)
+                gas_used = _hex_to_int(gas_used_hex)
             except (ValueError, TypeError):
                 gas_used = 0
             
@@ -243,22 +426,26 @@ def block_detail(block_number):
                 'transactions': block_details.get('transactions', [])
             }
             
-            return render_template('block_detail.html', block=block)
+            return CachedResponse(
+                render_with_etag('block_detail.html', f"block-{block_number}-{block['hash']}", block=block),
+                page_timeout(block_number, latest_block_num)
+            )
         
         # Fallback: Use Supabase ONLY if API fails
         else:
-            block_data = db_service.get_latest_blocks(limit=1000)  # Search wider range
-            for block in block_data:
-                if block.get('block_number') == block_number:
-                    return render_template('block_detail.html', block=block)
+            block = db_service.get_block_by_number(block_number)
+            if block:
+                return CachedResponse(
+                    render_with_etag('block_detail.html', f"block-{block_number}", block=block),
+                    page_timeout(block_number, latest_block_num)
+                )
             
             # Final validation - check if block should exist
-            latest_block_num = quai_api.get_latest_block_number()
             if latest_block_num and block_number <= latest_block_num:
                 # Block should exist but we can't fetch it - create basic structure
                 block = {
                     'block_number': block_number,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC"),
+                    'timestamp': now_utc_str(),
                     'tx_count': 0,
                     'gas_used': 0,
                     'hash': '0x' + '0' * 64,  # Placeholder
@@ -272,19 +459,20 @@ def block_detail(block_number):
         return render_template('block_detail.html', block=None)
 
 @app.route('/tx/<tx_hash>')
+@cache.cached(response_filter=is_data_page)
 def tx_detail(tx_hash):
     try:
-        # Get transaction details from API
-        tx_details = db_service.quai_api.get_transaction_details(tx_hash)
+        # The chain tip decides how long the page may be cached
+        latest_block_num = db_service.quai_api.get_latest_block_number()
+        
+        # Get transaction details and receipt from API in one batched call
+        tx_details, receipt = db_service.quai_api.get_transaction_with_receipt(tx_hash)
         
         if tx_details:
-            # Get transaction receipt for more info
-            receipt = db_service.quai_api.get_transaction_receipt(tx_hash)
-            
             # Parse values
             value_hex = tx_details.get('value', '0x0')
             try:
-                value_int = int(value_hex, 16) if value_hex.startswith('0x') else int(value_hex)
+                value_int = _hex_to_int(value_hex)
             except (ValueError, TypeError):
                 value_int = 0
             
@@ -293,7 +481,7 @@ def tx_detail(tx_hash):
             block_hex = tx_details.get('blockNumber', '0x0')
             if block_hex and block_hex != '0x0':
                 try:
-                    block_num = int(block_hex, 16)
+                    block_num = _hex_to_int(block_hex)
                 except ValueError:
                     block_num = None
             
@@ -307,12 +495,15 @@ def tx_detail(tx_hash):
                 'from_address': tx_details.get('from', ''),
                 'to_address': tx_details.get('to', ''),
                 'value': value_int,
-                'gas_used': int(receipt.get('gasUsed', '0x0'), 16) if receipt and receipt.get('gasUsed') else 0,
+                'gas_used': _hex_to_int(receipt.get('gasUsed')) if receipt else 0,
                 'direction': direction,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")  # Fallback timestamp
+                'timestamp': now_utc_str()  # Fallback timestamp
             }
             
-            return render_template('tx_detail.html', tx=tx)
+            return CachedResponse(
+                render_with_etag('tx_detail.html', f"tx-{tx_hash}-{block_num}-{bool(receipt)}", tx=tx),
+                page_timeout(block_num, latest_block_num)
+            )
         else:
             return render_template('tx_detail.html', tx=None)
             
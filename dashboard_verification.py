@@ -6,11 +6,62 @@ Tests all charts and enhanced functionality
 
 import sys
 import os
+from collections import Counter
 sys.path.append('.')
 
-from app import app
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # RE2 matches in linear time with no backtracking on large/odd pages
+    import re2 as re
+except ImportError:
+    import re
+
+from app import app, cache
 from datetime import datetime
 
+# Repeated route hits during verification are served from an in-process
+# cache for the whole run (page and data caches use the default timeout),
+# and Jinja does not stat() templates on every render
+app.config['TESTING'] = True
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+
+# Compiled once; the inline (?s) flag keeps the pattern portable between re and re2
+_CHART_RE = re.compile(r'(?s)const chartData = ({.*?});')
+
+# Every substring the checks below look for in the rendered dashboard
+NEEDLES = (
+    "chart.js", "DATA VISUALIZATIONS", "chart-container", "const chartData = ",
+    "CHART_TYPES", "txOverTimeChart", "directionChart", "gasUsageChart", "new Chart(",
+    "chartInsight", "lg:grid-cols-3", "chart-card", "rgba(59, 130, 246)",
+    "tx_over_time", "direction_breakdown", "gas_by_block", "labels", '"data"',
+    "Total Blocks", "Total Transactions", "Latest Blocks", "Latest Transactions",
+    'href="/blocks"', 'href="/transactions"', "monospace", "grid-cols-1",
+    "shadow-md", "rounded-lg", "hover:bg-gray-50", "maintAspectRatio: false",
+    "canvas", "nav", "section", "footer",
+)
+
+def count_needles(content, needles):
+    """Count occurrences of all needles in a single pass over content"""
+    if ahocorasick is None:
+        # pyahocorasick not installed - one scan per needle
+        return Counter({needle: content.count(needle) for needle in needles})
+    
+    automaton = ahocorasick.Automaton()
+    for needle in needles:
+        automaton.add_word(needle, needle)
+    automaton.make_automaton()
+    
+    hits = Counter()
+    for _, needle in automaton.iter(content):
+        hits[needle] += 1
+    return hits
+
 def main():
     print("=" * 80)
     print("ENHANCED DASHBOARD VERIFICATION - DATA VISUALIZATIONS")
@@ -25,25 +76,26 @@ def main():
             return
         
         content = response.get_data(as_text=True)
+        hits = count_needles(content, NEEDLES)
         
         print("\nCHART IMPLEMENTATION VERIFICATION")
         print("-" * 50)
         
         # Test Chart.js Integration
         tests = [
-            ("Chart.js CDN Loaded", "chart.js" in content),
-            ("Data Visualizations Section Added", "DATA VISUALIZATIONS" in content),
-            ("3 Chart Containers Present", content.count("chart-container") == 3),
-            ("Chart Data Passed from Backend", "const chartData = " in content),
-            ("Chart Types Implemented", "CHART_TYPES" in content),
-            ("Line Chart (Transactions Over Time)", "txOverTimeChart" in content),
-            ("Donut Chart (Direction Breakdown)", "directionChart" in content),
-            ("Bar Chart (Gas Usage)", "gasUsageChart" in content),
-            ("Chart Initialization Code", "new Chart(" in content),
-            ("Analytics Insight Section", "chartInsight" in content),
-            ("Responsive Grid Layout", "lg:grid-cols-3" in content),
-            ("Chart Card Styling", "chart-card" in content),
-            ("Professional Colors Applied", "rgba(59, 130, 246)" in content)
+            ("Chart.js CDN Loaded", hits["chart.js"] > 0),
+            ("Data Visualizations Section Added", hits["DATA VISUALIZATIONS"] > 0),
+            ("3 Chart Containers Present", hits["chart-container"] == 3),
+            ("Chart Data Passed from Backend", hits["const chartData = "] > 0),
+            ("Chart Types Implemented", hits["CHART_TYPES"] > 0),
+            ("Line Chart (Transactions Over Time)", hits["txOverTimeChart"] > 0),
+            ("Donut Chart (Direction Breakdown)", hits["directionChart"] > 0),
+            ("Bar Chart (Gas Usage)", hits["gasUsageChart"] > 0),
+            ("Chart Initialization Code", hits["new Chart("] > 0),
+            ("Analytics Insight Section", hits["chartInsight"] > 0),
+            ("Responsive Grid Layout", hits["lg:grid-cols-3"] > 0),
+            ("Chart Card Styling", hits["chart-card"] > 0),
+            ("Professional Colors Applied", hits["rgba(59, 130, 246)"] > 0)
         ]
         
         passed = 0
@@ -61,16 +113,15 @@ def main():
         print("-" * 50)
         
         # Verify chart data structure
-        import re
-        chart_data_match = re.search(r'const chartData = ({.*?});', content, re.DOTALL)
+        chart_data_match = _CHART_RE.search(content)
         
         data_tests = [
             ("Chart Data Extracted", bool(chart_data_match)),
-            ("Transaction Time Data Present", "tx_over_time" in content),
-            ("Direction Breakdown Data Present", "direction_breakdown" in content),
-            ("Gas Usage Data Present", "gas_by_block" in content),
-            ("Data Labels Present", "labels" in content),
-            ("Data Values Present", '"data"' in content),
+            ("Transaction Time Data Present", hits["tx_over_time"] > 0),
+            ("Direction Breakdown Data Present", hits["direction_breakdown"] > 0),
+            ("Gas Usage Data Present", hits["gas_by_block"] > 0),
+            ("Data Labels Present", hits["labels"] > 0),
+            ("Data Values Present", hits['"data"'] > 0),
         ]
         
         data_passed = 0
@@ -89,14 +140,14 @@ def main():
         
         # Test visual enhancements
         ui_tests = [
-            ("Original Stats Cards Preserved", "Total Blocks" in content and "Total Transactions" in content),
-            ("Original Blocks Table Preserved", "Latest Blocks" in content),
-            ("Original Transactions Table Preserved", "Latest Transactions" in content),
-            ("Navbar Links Preserved", 'href="/blocks"' in content and 'href="/transactions"' in content),
-            ("Monospace Font for Hashes", "monospace" in content),
-            ("Responsive Breakpoints", "grid-cols-1" in content),
-            ("Professional Card Styling", "shadow-md" in content and "rounded-lg" in content),
-            ("Subtle Animations", "hover:bg-gray-50" in content),
+            ("Original Stats Cards Preserved", hits["Total Blocks"] > 0 and hits["Total Transactions"] > 0),
+            ("Original Blocks Table Preserved", hits["Latest Blocks"] > 0),
+            ("Original Transactions Table Preserved", hits["Latest Transactions"] > 0),
+            ("Navbar Links Preserved", hits['href="/blocks"'] > 0 and hits['href="/transactions"'] > 0),
+            ("Monospace Font for Hashes", hits["monospace"] > 0),
+            ("Responsive Breakpoints", hits["grid-cols-1"] > 0),
+            ("Professional Card Styling", hits["shadow-md"] > 0 and hits["rounded-lg"] > 0),
+            ("Subtle Animations", hits["hover:bg-gray-50"] > 0),
         ]
         
         ui_passed = 0
@@ -114,11 +165,11 @@ def main():
         print("-" * 50)
         
         responsive_tests = [
-            ("Mobile-First Grid", "grid-cols-1" in content),
-            ("Desktop Grid", "lg:grid-cols-3" in content),
-            ("Responsive Charts", "maintAspectRatio: false" in content),
-            ("Accessible Chart Containers", "canvas" in content),
-            ("Semantic HTML5", "nav", "section", "footer" in content),
+            ("Mobile-First Grid", hits["grid-cols-1"] > 0),
+            ("Desktop Grid", hits["lg:grid-cols-3"] > 0),
+            ("Responsive Charts", hits["maintAspectRatio: false"] > 0),
+            ("Accessible Chart Containers", hits["canvas"] > 0),
+            ("Semantic HTML5", hits["nav"] > 0 and hits["section"] > 0 and hits["footer"] > 0),
         ]
         
         responsive_passed = 0
@@ -8,10 +8,18 @@ import sys
 import os
 sys.path.append('.')
 
-from app import app
+from app import app, cache
 from services.db import DatabaseService
 from datetime import datetime
 
+# Repeated route hits during verification are served from an in-process
+# cache for the whole run (page and data caches use the default timeout),
+# and Jinja does not stat() templates on every render
+app.config['TESTING'] = True
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+app.jinja_env.auto_reload = False
+cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+
 def test_route(client, route, description):
     """Test a specific route and report results"""
     print(f"\nTesting {description} ({route})...")
@@ -116,8 +124,9 @@ def main():
         # Test data quality
         print(f"\nTesting Data Quality...")
         
-        blocks = db.get_latest_blocks(limit=5)
-        txs = db.get_latest_transactions(limit=5)
+        snapshot = db.get_dashboard_snapshot(block_limit=5, tx_limit=5)
+        blocks = snapshot['blocks']
+        txs = snapshot['transactions']
         
         # Check timestamps
         timestamp_ok = True
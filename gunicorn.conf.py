@@ -0,0 +1,23 @@
+# Gunicorn settings for serving the dashboard outside Vercel:
+#   gunicorn app:app
+# I/O-bound handlers (Supabase / QUAI RPC) overlap on gevent workers, and
+# the app is imported once before forking so workers share its memory.
+from gevent import monkey
+
+# Patch before the preloaded app imports ssl/socket via requests. select is
+# left to the worker's own patch_all(): httpcore may import trio, which needs
+# select.epoll at import time
+monkey.patch_all(select=False)
+
+bind = '0.0.0.0:8000'
+workers = 4
+worker_class = 'gevent'
+worker_connections = 1000
+preload_app = True
+
+
+def post_fork(server, worker):
+    # Connections must not be shared across forked workers
+    from app import quai_api, db_service
+    quai_api.reset_session()
+    db_service.reset_clients()
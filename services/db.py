@@ -1,19 +1,92 @@
 import os
 import logging
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
 from supabase import create_client, Client
+import redis
+import threading
 import uuid
 
-from .quai_api import QuaiAPI
+from .quai_api import QuaiAPI, json_loads, to_int
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# HyperLogLog keys maintained at ingest; PFADD is idempotent, so re-upserting
+# the same transactions never inflates the counts (block totals come from the
+# chain tip, so blocks are not counted here)
+STATS_TXS_KEY = 'stats:txs'
+STATS_ADDRESSES_KEY = 'stats:addresses'
+
+# Rows per upsert request; keeps each PostgREST payload well under its limits
+UPSERT_BATCH_SIZE = 500
+
+# Indexes for the latest-N reads; blocks are already ordered by their
+# block_number primary key and tx_hash is declared UNIQUE
+INDEX_STATEMENTS = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS transactions_ts_desc_idx ON transactions (timestamp DESC)",
+]
+
+class TxRow(NamedTuple):
+    """A `transactions` table row, built without a per-row dict"""
+    id: str
+    wallet_address: str
+    tx_hash: str
+    from_address: Optional[str]
+    to_address: Optional[str]
+    value: int
+    gas_used: int
+    timestamp: str
+    direction: str
+    block_number: Optional[int]
+
+@lru_cache(maxsize=4096)
+def _iso_timestamp(ts: int) -> str:
+    """ISO-format a UTC unix timestamp; rows of one block share the same value"""
+    return datetime.utcfromtimestamp(ts).isoformat()
+
+def _normalize_address(address: Optional[str]) -> Optional[str]:
+    """Lowercase a hex address once so callers can compare with plain =="""
+    return address.lower() if address else address
+
+def _normalize_tx_addresses(transactions: List[Dict]) -> List[Dict]:
+    """Normalize from/to addresses of transaction rows in place"""
+    for tx in transactions:
+        tx['from_address'] = _normalize_address(tx.get('from_address'))
+        tx['to_address'] = _normalize_address(tx.get('to_address'))
+    return transactions
+
 class DatabaseService:
     def __init__(self):
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_KEY')
+        self._connect_supabase()
+        
+        self.quai_api = QuaiAPI()
+        
+        # Optional Redis for ingest-time network counters
+        self.redis_url = os.getenv('REDIS_URL')
+        self.redis = redis.Redis.from_url(self.redis_url) if self.redis_url else None
+        
+        # Optional direct Postgres (e.g. Supavisor pooler) URL for bulk upserts;
+        # the pool is opened on first use so it is never shared across forks
+        self.pg_dsn = os.getenv('SUPABASE_DIRECT_URL')
+        self._pg_pool = None
+        self._pg_pool_lock = threading.Lock()
+        
+        # Reference wallet for initial data
+        self.reference_wallet = "0x002624Fa55DFf0ca53aF9166B4d44c16a294C4e0"
+        
+        # Initialize fallback storage
+        self._fallback_blocks = []
+        self._fallback_transactions = []
+
+    def _connect_supabase(self):
+        """Build the Supabase client, or the REST session if the client fails"""
+        if hasattr(self, 'rest_client'):
+            self.rest_client.close()
+            del self.rest_client
         
         if not self.supabase_url or not self.supabase_key:
             logger.warning("Supabase credentials not found in environment variables")
@@ -38,15 +111,18 @@ class DatabaseService:
                 except Exception as rest_e:
                     logger.error(f"REST API fallback failed: {rest_e}")
                     self.supabase = None
+
+    def reset_clients(self):
+        """Rebuild every network client, e.g. in a freshly forked worker"""
+        self._connect_supabase()
+        self.redis = redis.Redis.from_url(self.redis_url) if self.redis_url else None
         
-        self.quai_api = QuaiAPI()
-        
-        # Reference wallet for initial data
-        self.reference_wallet = "0x002624Fa55DFf0ca53aF9166B4d44c16a294C4e0"
+        # A pool only exists here if something wrote before forking; forget
+        # it so this worker opens its own on first use
+        with self._pg_pool_lock:
+            self._pg_pool = None
         
-        # Initialize fallback storage
-        self._fallback_blocks = []
-        self._fallback_transactions = []
+        self.quai_api.reset_session()
 
     def _initialize_tables_if_needed(self):
         """Create tables if they don't exist"""
@@ -68,6 +144,134 @@ class DatabaseService:
             logger.error(f"Table initialization failed: {str(e)}")
             return False
 
+    def _create_indexes_if_needed(self):
+        """Create the read indexes without blocking writes to the tables
+
+        Every statement is IF NOT EXISTS, so once the indexes exist this is a
+        catalog lookup and safe to run on each sync.
+        """
+        pool = self._get_pg_pool()
+        if pool is None:
+            if not self.supabase:
+                return
+            # Functions run inside a transaction, so this one can't build
+            # CONCURRENTLY; fine for a fresh project
+            self.supabase.rpc('create_indexes_if_not_exists').execute()
+            return
+        
+        with pool.connection() as conn:
+            # CREATE INDEX CONCURRENTLY refuses to run in a transaction block
+            conn.autocommit = True
+            try:
+                for statement in INDEX_STATEMENTS:
+                    conn.execute(statement)
+            finally:
+                conn.autocommit = False
+
+    def _record_ingest_stats(self, tx_hashes: List[str] = (), addresses: List[str] = ()):
+        """Fold ingested transactions into the Redis network counters"""
+        if not self.redis:
+            return
+            
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            if tx_hashes:
+                pipe.pfadd(STATS_TXS_KEY, *tx_hashes)
+            if addresses:
+                pipe.pfadd(STATS_ADDRESSES_KEY, *addresses)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to record ingest stats: {str(e)}")
+
+    def _get_ingest_stats(self) -> Optional[Dict]:
+        """Read the Redis network counters, or None if nothing was ingested yet"""
+        if not self.redis:
+            return None
+            
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.pfcount(STATS_TXS_KEY)
+            pipe.pfcount(STATS_ADDRESSES_KEY)
+            total_transactions, active_addresses = pipe.execute()
+        except redis.RedisError as e:
+            logger.error(f"Failed to read ingest stats: {str(e)}")
+            return None
+        
+        if not total_transactions:
+            return None
+        return {
+            'total_transactions': total_transactions,
+            'active_addresses': active_addresses
+        }
+
+    def _get_pg_pool(self):
+        """Get the direct Postgres connection pool, or None if not configured"""
+        if not self.pg_dsn:
+            return None
+        
+        with self._pg_pool_lock:
+            if self._pg_pool is None:
+                try:
+                    from psycopg_pool import ConnectionPool
+                    self._pg_pool = ConnectionPool(self.pg_dsn, min_size=2, max_size=10, timeout=2.0, open=True)
+                    logger.info("Using direct Postgres pool for upserts")
+                except Exception as e:
+                    logger.error(f"Postgres pool unavailable, using PostgREST: {str(e)}")
+                    self.pg_dsn = None
+            return self._pg_pool
+
+    def _pg_upsert_rows(self, pool, table: str, columns: Sequence[str], values: List[tuple], on_conflict: str):
+        """Upsert value tuples over a pooled Postgres connection in one transaction"""
+        from psycopg import sql
+        
+        statement = sql.SQL(
+            "INSERT INTO {table} ({columns}) VALUES ({values}) "
+            "ON CONFLICT ({conflict}) DO UPDATE SET {updates}"
+        ).format(
+            table=sql.Identifier(table),
+            columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+            values=sql.SQL(', ').join(sql.Placeholder() * len(columns)),
+            conflict=sql.Identifier(on_conflict),
+            updates=sql.SQL(', ').join(
+                sql.SQL("{col} = EXCLUDED.{col}").format(col=sql.Identifier(col))
+                for col in columns if col != on_conflict
+            )
+        )
+        
+        with pool.connection() as conn:
+            with conn.transaction():
+                # Ingested rows can always be re-fetched from the node, so
+                # don't wait for the WAL flush on commit
+                conn.execute("SET LOCAL synchronous_commit = OFF")
+                with conn.cursor() as cur:
+                    cur.executemany(statement, values)
+
+    def _upsert_rows(self, table: str, rows: List, on_conflict: str):
+        """Upsert rows with one round trip per UPSERT_BATCH_SIZE rows
+
+        Rows are dicts or NamedTuples; NamedTuples go to Postgres as-is.
+        """
+        is_tuple_rows = hasattr(rows[0], '_fields')
+        
+        pool = self._get_pg_pool()
+        if pool is not None:
+            try:
+                if is_tuple_rows:
+                    self._pg_upsert_rows(pool, table, rows[0]._fields, rows, on_conflict)
+                else:
+                    columns = list(rows[0].keys())
+                    values = [tuple(row.get(col) for col in columns) for row in rows]
+                    self._pg_upsert_rows(pool, table, columns, values, on_conflict)
+                return
+            except Exception as e:
+                logger.error(f"Postgres upsert failed, using PostgREST: {str(e)}")
+        
+        if is_tuple_rows:
+            rows = [row._asdict() for row in rows]
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            self.supabase.from_(table).upsert(batch, on_conflict=on_conflict).execute()
+
     def update_wallet_data(self, address: str) -> bool:
         """Update wallet balance and transactions"""
         if not self.supabase:
@@ -82,7 +286,7 @@ class DatabaseService:
             # Update wallet
             wallet_data = {
                 'address': address,
-                'balance': int(balance),
+                'balance': to_int(balance),
                 'last_updated': datetime.now(timezone.utc).isoformat()
             }
             
@@ -109,41 +313,46 @@ class DatabaseService:
                 direction = 'incoming' if tx.get('to', '').lower() == wallet_address.lower() else 'outgoing'
                 
                 # Parse timestamp (QUAI timestamps are in seconds)
-                timestamp_int = int(tx.get('timeStamp', '0'))
-                timestamp = datetime.utcfromtimestamp(timestamp_int).isoformat()
+                timestamp_int = to_int(tx.get('timeStamp'))
+                timestamp = _iso_timestamp(timestamp_int)
                 
                 # Parse value
                 value_hex = tx.get('value', '0x0')
                 try:
-                    value_int = int(value_hex, 16) if value_hex.startswith('0x') else int(value_hex)
+                    value_int = to_int(value_hex)
                 except (ValueError, TypeError):
                     value_int = 0
                 
-                tx_data = {
-                    'id': str(uuid.uuid4()),
-                    'wallet_address': wallet_address,
-                    'tx_hash': tx.get('hash', ''),
-                    'from_address': tx.get('from', ''),
-                    'to_address': tx.get('to', ''),
-                    'value': value_int,
-                    'gas_used': int(tx.get('gasUsed', '0'), 16) if tx.get('gasUsed') else 0,
-                    'timestamp': timestamp,
-                    'direction': direction,
-                    'block_number': int(tx.get('blockNumber', '0x0'), 16) if tx.get('blockNumber') else None
-                }
-                
-                if self.supabase:
-                    # Upsert transaction
-                    self.supabase.from_('transactions').upsert(tx_data).execute()
-                else:
-                    # Store in memory for fallback
-                    stored_txs.append(tx_data)
+                stored_txs.append(TxRow(
+                    # Derived from the hash so re-storing a transaction keeps its id
+                    id=str(uuid.uuid5(uuid.NAMESPACE_OID, tx.get('hash', ''))),
+                    wallet_address=wallet_address,
+                    tx_hash=tx.get('hash', ''),
+                    from_address=_normalize_address(tx.get('from', '')),
+                    to_address=_normalize_address(tx.get('to', '')),
+                    value=value_int,
+                    gas_used=to_int(tx.get('gasUsed')),
+                    timestamp=timestamp,
+                    direction=direction,
+                    block_number=to_int(tx['blockNumber']) if tx.get('blockNumber') else None
+                ))
+            
+            if self.supabase and stored_txs:
+                # One upsert per batch; a hash may appear only once per statement
+                unique_txs = list({tx_row.tx_hash: tx_row for tx_row in stored_txs}.values())
+                self._upsert_rows('transactions', unique_txs, on_conflict='tx_hash')
                 
             # Store transactions for fallback if no Supabase
-            if not self.supabase and stored_txs:
+            elif stored_txs:
                 if not hasattr(self, '_fallback_transactions'):
                     self._fallback_transactions = []
-                self._fallback_transactions.extend(stored_txs)
+                self._fallback_transactions.extend(tx_row._asdict() for tx_row in stored_txs)
+            
+            self._record_ingest_stats(
+                tx_hashes=[tx['hash'] for tx in transactions if tx.get('hash')],
+                addresses=[_normalize_address(addr) for tx in transactions
+                           for addr in (tx.get('from'), tx.get('to')) if addr]
+            )
                 
             return True
             
@@ -161,68 +370,46 @@ class DatabaseService:
                 return False
             
             blocks_data = []
+            ingested_txs = []
             # Get details for latest blocks
-            for i in range(count):
-                block_num = latest_block_num - i
-                block_details = self.quai_api.get_block_details(block_num)
-                
+            block_nums = [latest_block_num - i for i in range(count)]
+            for block_num, block_details in self.quai_api.iter_blocks_details(block_nums):
                 if block_details:
+                    ingested_txs.extend(block_details.get('transactions', []))
+                    
                     # Parse timestamp (handle hex format - QUAI timestamps are in SECONDS)
                     # QUAI API puts timestamp in woHeader.timestamp
                     wo_header = block_details.get('woHeader', {})
                     timestamp_hex = wo_header.get('timestamp', '0x0')
                     try:
-                        timestamp_int = int(timestamp_hex, 16)
+                        timestamp_int = to_int(timestamp_hex)
                         # QUAI timestamps are in seconds, not milliseconds
-                        timestamp = datetime.utcfromtimestamp(timestamp_int).isoformat()
+                        timestamp = _iso_timestamp(timestamp_int)
                     except (ValueError, TypeError):
                         timestamp = datetime.now(timezone.utc).isoformat()
                     
                     block_data = {
                         'block_number': block_num,
                         'tx_count': len(block_details.get('transactions', [])),
-                        'gas_used': int(block_details.get('gasUsed', '0x0'), 16) if block_details.get('gasUsed') else 0,
+                        'gas_used': to_int(block_details.get('gasUsed')),
                         'timestamp': timestamp
                     }
                     
-                    if self.supabase:
-                        # Upsert block
-                        self.supabase.from_('blocks').upsert(block_data).execute()
-                    else:
-                        # Store in memory for fallback
-                        blocks_data.append(block_data)
+                    blocks_data.append(block_data)
+            
+            if self.supabase and blocks_data:
+                # Upsert all blocks in one request
+                self._upsert_rows('blocks', blocks_data, on_conflict='block_number')
             
             # Store blocks data for fallback if no Supabase
-            if not self.supabase and blocks_data:
+            elif blocks_data:
                 self._fallback_blocks = blocks_data
             
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to update blocks: {str(e)}")
-            return False
-            
-        try:
-            # Get latest block number
-            latest_block_num = self.quai_api.get_latest_block_number()
-            if latest_block_num is None:
-                return False
-            
-            # Get details for latest blocks
-            for i in range(count):
-                block_num = latest_block_num - i
-                block_details = self.quai_api.get_block_details(block_num)
-                
-                if block_details:
-                    block_data = {
-                        'block_number': block_num,
-                        'tx_count': len(block_details.get('transactions', [])),
-                        'gas_used': int(block_details.get('gasUsed', '0x0'), 16),
-                        'timestamp': datetime.fromtimestamp(int(block_details.get('timestamp', '0'), 16), timezone.utc).isoformat()
-                    }
-                    
-                    # Upsert block
-                    self.supabase.from_('blocks').upsert(block_data).execute()
+            self._record_ingest_stats(
+                tx_hashes=[tx['hash'] for tx in ingested_txs if tx.get('hash')],
+                addresses=[_normalize_address(addr) for tx in ingested_txs
+                           for addr in (tx.get('from'), tx.get('to')) if addr]
+            )
             
             return True
             
@@ -230,167 +417,234 @@ class DatabaseService:
             logger.error(f"Failed to update blocks: {str(e)}")
             return False
 
-    def _rest_get_latest_blocks(self, limit: int = 10) -> List[Dict]:
+    def _rest_get_latest_blocks(self, limit: int = 10, offset: int = 0) -> List[Dict]:
         """Get latest blocks using REST API fallback"""
         if not hasattr(self, 'rest_client'):
             return []
             
         try:
             url = f"{self.supabase_url}/rest/v1/blocks"
-            params = {'select': '*', 'order': 'block_number.desc', 'limit': limit}
+            params = {'select': '*', 'order': 'block_number.desc', 'limit': limit, 'offset': offset}
             response = self.rest_client.get(url, params=params, timeout=10)
             response.raise_for_status()
-            return response.json() or []
+            return json_loads(response.content) or []
         except Exception as e:
             logger.error(f"REST API blocks fetch failed: {str(e)}")
             return []
 
-    def get_latest_blocks(self, limit: int = 10) -> List[Dict]:
-        """Get latest blocks from database or fallback"""
+    def _get_stored_blocks(self, limit: int = 10, offset: int = 0) -> Optional[List[Dict]]:
+        """Get latest blocks from Supabase, the REST API or in-memory rows; None if none has them"""
         if self.supabase:
             try:
-                result = self.supabase.from_('blocks').select('*').order('block_number', desc=True).limit(limit).execute()
+                result = self.supabase.from_('blocks').select('*').order('block_number', desc=True).range(offset, offset + limit - 1).execute()
                 return result.data or []
             except Exception as e:
                 logger.error(f"Supabase blocks fetch failed: {str(e)}")
         
         # Try REST API fallback
-        rest_blocks = self._rest_get_latest_blocks(limit)
+        rest_blocks = self._rest_get_latest_blocks(limit, offset)
         if rest_blocks:
             return rest_blocks
         
-        # Return fallback data if available, otherwise try to fetch live
+        # Return fallback data if available
         if hasattr(self, '_fallback_blocks') and self._fallback_blocks:
-            return sorted(self._fallback_blocks, key=lambda x: x['block_number'], reverse=True)[:limit]
+            return sorted(self._fallback_blocks, key=lambda x: x['block_number'], reverse=True)[offset:offset + limit]
         
-        # Fallback: fetch live data
+        return None
+
+    def _block_row(self, block_num: int, block_details: Dict) -> Dict:
+        """Build a dashboard block row from a node block"""
+        # Parse timestamp from woHeader (QUAI API puts timestamp there)
+        wo_header = block_details.get('woHeader', {})
+        timestamp_hex = wo_header.get('timestamp', '0x0')
         try:
-            latest_block_num = self.quai_api.get_latest_block_number()
-            if latest_block_num:
-                blocks = []
-                for i in range(max(limit, 10)):  # Ensure at least 10 blocks for gas chart
-                    block_num = latest_block_num - i
-                    block_details = self.quai_api.get_block_details(block_num)
-                    
-                    if block_details:
-                        # Parse timestamp from woHeader (QUAI API puts timestamp there)
-                        wo_header = block_details.get('woHeader', {})
-                        timestamp_hex = wo_header.get('timestamp', '0x0')
-                        try:
-                            timestamp_int = int(timestamp_hex, 16)
-                            # QUAI timestamps are in seconds, not milliseconds
-                            timestamp = datetime.utcfromtimestamp(timestamp_int).isoformat()
-                        except (ValueError, TypeError):
-                            timestamp = datetime.now(timezone.utc).isoformat()
-                        
-                        # Parse gas_used correctly
-                        gas_used_hex = block_details.get('gasUsed', '0x0')
-                        try:
-                            gas_used = int(gas_used_hex, 16)
-                        except (ValueError, TypeError):
-                            gas_used = 0
-                        
-                        blocks.append({
-                            'block_number': block_num,
-                            'tx_count': len(block_details.get('transactions', [])),
-                            'gas_used': gas_used,
-                            'timestamp': timestamp
-                        })
+            timestamp_int = to_int(timestamp_hex)
+            # QUAI timestamps are in seconds, not milliseconds
+            timestamp = _iso_timestamp(timestamp_int)
+        except (ValueError, TypeError):
+            timestamp = datetime.now(timezone.utc).isoformat()
+        
+        # Parse gas_used correctly
+        gas_used_hex = block_details.get('gasUsed', '0x0')
+        try:
+            gas_used = to_int(gas_used_hex)
+        except (ValueError, TypeError):
+            gas_used = 0
+        
+        return {
+            'block_number': block_num,
+            'tx_count': len(block_details.get('transactions', [])),
+            'gas_used': gas_used,
+            'timestamp': timestamp
+        }
+
+    def _tx_rows(self, block_num: int, block_details: Dict) -> Iterator[Dict]:
+        """Yield dashboard transaction rows for a node block"""
+        if 'transactions' not in block_details:
+            return
+        
+        # Parse timestamp from woHeader (QUAI timestamps are in seconds)
+        wo_header = block_details.get('woHeader', {})
+        timestamp_hex = wo_header.get('timestamp', '0x0')
+        try:
+            timestamp_int = to_int(timestamp_hex)
+            timestamp = _iso_timestamp(timestamp_int)
+        except (ValueError, TypeError):
+            timestamp = datetime.now(timezone.utc).isoformat()
+        
+        for tx in block_details['transactions']:
+            # Only include transactions with actual data
+            if tx.get('hash') and tx.get('from') and tx.get('to'):
+                # Parse value
+                value_hex = tx.get('value', '0x0')
+                try:
+                    value_int = to_int(value_hex)
+                except (ValueError, TypeError):
+                    value_int = 0
                 
-                if blocks:
-                    return blocks
+                yield {
+                    'tx_hash': tx.get('hash', ''),
+                    'from_address': _normalize_address(tx.get('from', '')),
+                    'to_address': _normalize_address(tx.get('to', '')),
+                    'value': value_int,
+                    'direction': 'outgoing',  # Default direction
+                    'block_number': block_num,
+                    'timestamp': timestamp
+                }
+
+    def _sweep_latest_blocks(self, block_count: int, tx_count: int, start: int = 0) -> Tuple[List[Dict], List[Dict]]:
+        """Build block rows and transaction rows from one walk down from the tip
+
+        Collects rows for the first `block_count` blocks below `start` and the
+        first `tx_count` transactions, fetching each block only once.
+        """
+        latest_block_num = self.quai_api.get_latest_block_number()
+        if not latest_block_num:
+            return [], []
+        
+        # Check more blocks for transactions, for better chart data
+        tx_blocks = min(100, max(tx_count * 10, 50)) if tx_count else 0
+        block_nums = [latest_block_num - start - i for i in range(max(block_count, tx_blocks))]
+        
+        blocks = []
+        transactions = []
+        for i, (block_num, block_details) in enumerate(self.quai_api.iter_blocks_details(block_nums)):
+            if block_details:
+                if i < block_count:
+                    blocks.append(self._block_row(block_num, block_details))
+                if len(transactions) < tx_count:
+                    for tx_row in self._tx_rows(block_num, block_details):
+                        transactions.append(tx_row)
+                        if len(transactions) >= tx_count:
+                            break
+            
+            if i + 1 >= block_count and len(transactions) >= tx_count:
+                break
+        
+        return blocks, transactions
+
+    def get_latest_blocks(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Get latest blocks from database or fallback, skipping the newest `offset`"""
+        stored_blocks = self._get_stored_blocks(limit, offset)
+        if stored_blocks is not None:
+            return stored_blocks
+        
+        # Fallback: fetch live data
+        try:
+            # Ensure at least 10 blocks for gas chart
+            blocks, _ = self._sweep_latest_blocks(max(limit, 10), 0, start=offset)
+            if blocks:
+                return blocks
         except Exception as e:
             logger.error(f"Live block fetch failed: {str(e)}")
         
         # Final fallback: empty list
         return []
 
-    def _rest_get_latest_transactions(self, limit: int = 10) -> List[Dict]:
+    def _rest_get_block_by_number(self, block_number: int) -> Optional[Dict]:
+        """Get a single block using REST API fallback"""
+        if not hasattr(self, 'rest_client'):
+            return None
+            
+        try:
+            url = f"{self.supabase_url}/rest/v1/blocks"
+            params = {'select': '*', 'block_number': f'eq.{block_number}', 'limit': 1}
+            response = self.rest_client.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            rows = json_loads(response.content) or []
+            return rows[0] if rows else None
+        except Exception as e:
+            logger.error(f"REST API block fetch failed: {str(e)}")
+            return None
+
+    def get_block_by_number(self, block_number: int) -> Optional[Dict]:
+        """Get a single stored block by number (primary key lookup)"""
+        if self.supabase:
+            try:
+                result = self.supabase.from_('blocks').select('*').eq('block_number', block_number).limit(1).execute()
+                if result.data:
+                    return result.data[0]
+            except Exception as e:
+                logger.error(f"Supabase block fetch failed: {str(e)}")
+        
+        # Try REST API fallback
+        rest_block = self._rest_get_block_by_number(block_number)
+        if rest_block:
+            return rest_block
+        
+        # Check fallback data
+        for block in getattr(self, '_fallback_blocks', []):
+            if block.get('block_number') == block_number:
+                return block
+        
+        return None
+
+    def _rest_get_latest_transactions(self, limit: int = 10, offset: int = 0) -> List[Dict]:
         """Get latest transactions using REST API fallback"""
         if not hasattr(self, 'rest_client'):
             return []
             
         try:
             url = f"{self.supabase_url}/rest/v1/transactions"
-            params = {'select': '*', 'order': 'timestamp.desc', 'limit': limit}
+            params = {'select': '*', 'order': 'timestamp.desc', 'limit': limit, 'offset': offset}
             response = self.rest_client.get(url, params=params, timeout=10)
             response.raise_for_status()
-            return response.json() or []
+            return json_loads(response.content) or []
         except Exception as e:
             logger.error(f"REST API transactions fetch failed: {str(e)}")
             return []
 
-    def get_latest_transactions(self, limit: int = 10) -> List[Dict]:
-        """Get latest transactions from database or fallback"""
+    def _get_stored_transactions(self, limit: int = 10, offset: int = 0) -> Optional[List[Dict]]:
+        """Get latest transactions from Supabase, the REST API or in-memory rows; None if none has them"""
         if self.supabase:
             try:
-                result = self.supabase.from_('transactions').select('*').order('timestamp', desc=True).limit(limit).execute()
-                return result.data or []
+                result = self.supabase.from_('transactions').select('*').order('timestamp', desc=True).range(offset, offset + limit - 1).execute()
+                return _normalize_tx_addresses(result.data or [])
             except Exception as e:
                 logger.error(f"Supabase transactions fetch failed: {str(e)}")
         
         # Try REST API fallback
-        rest_transactions = self._rest_get_latest_transactions(limit)
+        rest_transactions = self._rest_get_latest_transactions(limit, offset)
         if rest_transactions:
-            return rest_transactions
+            return _normalize_tx_addresses(rest_transactions)
         
-        # Return fallback data if available, otherwise try to fetch live
+        # Return fallback data if available
         if hasattr(self, '_fallback_transactions') and self._fallback_transactions:
-            return sorted(self._fallback_transactions, key=lambda x: x['timestamp'], reverse=True)[:limit]
+            return sorted(self._fallback_transactions, key=lambda x: x['timestamp'], reverse=True)[offset:offset + limit]
+        
+        return None
+
+    def get_latest_transactions(self, limit: int = 10, offset: int = 0) -> List[Dict]:
+        """Get latest transactions from database or fallback, skipping the newest `offset`"""
+        stored_transactions = self._get_stored_transactions(limit, offset)
+        if stored_transactions is not None:
+            return stored_transactions
         
         # Fallback: fetch live data from recent blocks - Enhanced for charts
         try:
-            latest_block_num = self.quai_api.get_latest_block_number()
-            if not latest_block_num:
-                return []
-            
-            transactions = []
-            blocks_to_check = min(100, max(limit * 10, 50))  # Check more blocks for better chart data
-            
-            for i in range(blocks_to_check):
-               block_num = latest_block_num - i
-               block_details = self.quai_api.get_block_details(block_num)
-               
-               if block_details and 'transactions' in block_details:
-                   for tx in block_details['transactions']:
-                       # Only include transactions with actual data
-                       if tx.get('hash') and tx.get('from') and tx.get('to'):
-                           # Parse timestamp from woHeader (QUAI timestamps are in seconds)
-                           wo_header = block_details.get('woHeader', {})
-                           timestamp_hex = wo_header.get('timestamp', '0x0')
-                           try:
-                               timestamp_int = int(timestamp_hex, 16)
-                               timestamp = datetime.utcfromtimestamp(timestamp_int).isoformat()
-                           except (ValueError, TypeError):
-                               timestamp = datetime.now(timezone.utc).isoformat()
-                           
-                           # Parse value
-                           value_hex = tx.get('value', '0x0')
-                           try:
-                               value_int = int(value_hex, 16) if value_hex.startswith('0x') else int(value_hex)
-                           except (ValueError, TypeError):
-                               value_int = 0
-                           
-                           normalized_tx = {
-                               'tx_hash': tx.get('hash', ''),
-                               'from_address': tx.get('from', ''),
-                               'to_address': tx.get('to', ''),
-                               'value': value_int,
-                               'direction': 'outgoing',  # Default direction
-                               'block_number': block_num,
-                               'timestamp': timestamp
-                           }
-                           
-                           transactions.append(normalized_tx)
-                           
-                           if len(transactions) >= limit:
-                               break
-               
-               if len(transactions) >= limit:
-                   break
-            
+            _, transactions = self._sweep_latest_blocks(0, offset + limit)
             if transactions:
-                return transactions
+                return transactions[offset:]
                      
         except Exception as e:
             logger.error(f"Live transaction fetch failed: {str(e)}")
@@ -398,6 +652,80 @@ class DatabaseService:
         # Final fallback: empty list
         return []
 
+    def get_dashboard_snapshot(self, block_limit: int = 10, tx_limit: int = 10) -> Dict:
+        """Get latest blocks and transactions together
+
+        When both have to come from the node, a single sweep over recent blocks
+        fills both lists instead of scanning the same blocks twice.
+        """
+        blocks = self._get_stored_blocks(block_limit)
+        transactions = self._get_stored_transactions(tx_limit)
+        
+        if blocks is None or transactions is None:
+            try:
+                # Ensure at least 10 blocks for gas chart
+                live_blocks, live_transactions = self._sweep_latest_blocks(
+                    max(block_limit, 10) if blocks is None else 0,
+                    tx_limit if transactions is None else 0
+                )
+                if blocks is None:
+                    blocks = live_blocks
+                if transactions is None:
+                    transactions = live_transactions
+            except Exception as e:
+                logger.error(f"Live snapshot fetch failed: {str(e)}")
+        
+        return {
+            'blocks': blocks or [],
+            'transactions': transactions or []
+        }
+
+    def get_tx_direction_counts(self, window: int = 500) -> Optional[Tuple[int, int]]:
+        """Count (self, external) transfers over the latest `window` transactions in SQL
+
+        Uses the `tx_direction_counts` Postgres function (see README), so only
+        two integers cross the wire. Returns None when it is unavailable.
+        """
+        if not self.supabase:
+            return None
+            
+        try:
+            result = self.supabase.rpc('tx_direction_counts', {'window_size': window}).execute()
+            rows = result.data or []
+            if not rows:
+                return None
+            return int(rows[0]['self_ct'] or 0), int(rows[0]['ext_ct'] or 0)
+        except Exception as e:
+            logger.error(f"Direction counts fetch failed: {str(e)}")
+            return None
+
+    def get_recent_activity_counts(self, window: int = 50) -> Optional[Tuple[int, int]]:
+        """Count (transactions, distinct addresses) over the latest `window` transactions in SQL
+
+        Uses the `recent_activity_counts` Postgres function (see README), so
+        both numbers share one scope and only two integers cross the wire.
+        Returns None when it is unavailable.
+        """
+        if not self.supabase:
+            return None
+            
+        try:
+            result = self.supabase.rpc('recent_activity_counts', {'window_size': window}).execute()
+            rows = result.data or []
+            if not rows:
+                return None
+            return int(rows[0]['tx_ct'] or 0), int(rows[0]['address_ct'] or 0)
+        except Exception as e:
+            logger.error(f"Active addresses count failed: {str(e)}")
+            return None
+
+    def _count_rows(self, table: str, column: str) -> int:
+        """Count a table's rows server-side instead of downloading them"""
+        # PostgREST reports the exact total in Content-Range; limit(1) keeps
+        # the response body to a single row
+        result = self.supabase.from_(table).select(column, count='exact').limit(1).execute()
+        return result.count or 0
+
     def get_network_stats(self) -> Dict:
         """Get network statistics"""
         try:
@@ -407,18 +735,28 @@ class DatabaseService:
             if latest_block_num:
                 total_blocks = latest_block_num
                 
-                # Get recent transactions count
-                transactions = self.get_latest_transactions(limit=50)
-                total_transactions = len(transactions)
-                
-                # Get unique addresses from recent transactions
-                addresses = set()
-                for tx in transactions:
-                    if tx.get('from_address'):
-                        addresses.add(tx.get('from_address'))
-                    if tx.get('to_address'):
-                        addresses.add(tx.get('to_address'))
-                active_addresses = len(addresses)
+                # Prefer the counters maintained at ingest (O(1) Redis reads)
+                ingest_stats = self._get_ingest_stats()
+                if ingest_stats:
+                    total_transactions = ingest_stats['total_transactions']
+                    active_addresses = ingest_stats['active_addresses']
+                else:
+                    # Count recent transactions and their unique addresses in
+                    # SQL, or from the same recent rows in Python
+                    activity_counts = self.get_recent_activity_counts(window=50)
+                    if activity_counts is not None:
+                        total_transactions, active_addresses = activity_counts
+                    else:
+                        transactions = self.get_latest_transactions(limit=50)
+                        total_transactions = len(transactions)
+                        
+                        addresses = set()
+                        for tx in transactions:
+                            if tx.get('from_address'):
+                                addresses.add(tx.get('from_address'))
+                            if tx.get('to_address'):
+                                addresses.add(tx.get('to_address'))
+                        active_addresses = len(addresses)
                 
                 return {
                     'total_blocks': total_blocks,
@@ -441,16 +779,13 @@ class DatabaseService:
             
         try:
             # Get total blocks
-            blocks_result = self.supabase.from_('blocks').select('block_number').execute()
-            total_blocks = len(blocks_result.data or [])
+            total_blocks = self._count_rows('blocks', 'block_number')
             
             # Get total transactions
-            txs_result = self.supabase.from_('transactions').select('id').execute()
-            total_transactions = len(txs_result.data or [])
+            total_transactions = self._count_rows('transactions', 'id')
             
             # Get active addresses (unique wallet addresses)
-            wallets_result = self.supabase.from_('wallets').select('address').execute()
-            active_addresses = len(wallets_result.data or [])
+            active_addresses = self._count_rows('wallets', 'address')
             
             return {
                 'total_blocks': total_blocks,
@@ -470,6 +805,12 @@ class DatabaseService:
 
     def sync_reference_data(self):
         """Sync initial data using reference wallet"""
+        try:
+            # Make sure the latest-N read indexes exist before ingesting
+            self._create_indexes_if_needed()
+        except Exception as e:
+            logger.error(f"Index setup failed: {str(e)}")
+        
         try:
             # Update reference wallet
             self.update_wallet_data(self.reference_wallet)
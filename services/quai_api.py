@@ -1,21 +1,223 @@
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
-from typing import Dict, List, Optional
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 import logging
-import json
+
+try:
+    # Several times faster on large eth_getBlockByNumber payloads
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def to_int(value) -> int:
+    """Convert a node quantity (int, 0x-hex or decimal string) to int; missing values are 0"""
+    if isinstance(value, int):
+        return value
+    if not value:
+        return 0
+    return int(value, 16) if value[:2] == '0x' else int(value)
+
+# Keep-alive pool sized for concurrent route lookups and block fan-out; node
+# calls are read-only JSON-RPC, so POSTs are safe to retry on connection
+# errors and transient gateway responses. Read timeouts are not retried: a
+# hung node would otherwise hold a request for several full timeouts
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+RPC_RETRY = Retry(
+    total=3,
+    connect=3,
+    read=0,
+    status=3,
+    backoff_factor=0.1,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=frozenset(['GET', 'POST'])
+)
+
+# A node without batch support answers the array with a single JSON-RPC
+# error object, sent as 200 or 400; other statuses (429 rate limits, auth
+# errors) say nothing about batching and must not trigger the fan-out
+BATCH_REJECTION_STATUSES = frozenset([200, 400])
+
+# Block scans request this many blocks per batch (or concurrently, if the
+# node rejects batches)
+BLOCK_FETCH_WINDOW = 16
+_block_fetch_pool = ThreadPoolExecutor(max_workers=BLOCK_FETCH_WINDOW)
+
+# When the node rejects batches, fan the calls out over one multiplexed
+# HTTP/2 connection (falls back to HTTP/1.1 if h2 is not installed)
+try:
+    import h2  # noqa: F401
+    ASYNC_HTTP2 = True
+except ImportError:
+    ASYNC_HTTP2 = False
+
+# Finalized blocks never change, so keep the most recent ones in memory;
+# blocks this close to the tip may still be reorged and are not cached
+BLOCK_CACHE_SIZE = 2048
+REORG_SAFE_DEPTH = 6
+
+# Final blocks are also kept in a bounded SQLite file so a restarted process
+# starts warm; the newest ones are loaded into memory on startup
+BLOCK_DISK_CACHE_SIZE = 50000
+WARM_START_BLOCKS = 256
+
+# Workers share the file, so writers wait at most this long for each other
+# (a blocking wait stalls a whole gevent worker) before skipping the cache
+DISK_CACHE_BUSY_TIMEOUT = 0.25
+
+# One SQLite connection per file per process, shared by every QuaiAPI;
+# path -> (owning pid, connection, lock)
+_disk_handles: Dict[str, Tuple[int, sqlite3.Connection, threading.Lock]] = {}
+_disk_handles_lock = threading.Lock()
+
+def _shared_disk_handle(path: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    """Get this process's connection to a block cache file, opening it on first use"""
+    with _disk_handles_lock:
+        handle = _disk_handles.get(path)
+        if handle is None or handle[0] != os.getpid():
+            # A handle from the parent process is left alone: SQLite
+            # connections must not be used (or closed) across a fork
+            disk = sqlite3.connect(path, timeout=DISK_CACHE_BUSY_TIMEOUT, check_same_thread=False)
+            # WAL lets readers proceed while another worker writes
+            disk.execute("PRAGMA journal_mode=WAL")
+            disk.execute("PRAGMA synchronous=NORMAL")
+            disk.execute("CREATE TABLE IF NOT EXISTS block_cache (num INTEGER PRIMARY KEY, json BLOB)")
+            handle = (os.getpid(), disk, threading.Lock())
+            _disk_handles[path] = handle
+        return handle[1], handle[2]
+
+def _close_disk_handle(path: str):
+    """Close this process's connection to a block cache file, if it has one"""
+    with _disk_handles_lock:
+        handle = _disk_handles.pop(path, None)
+        if handle is not None and handle[0] == os.getpid():
+            handle[1].close()
+
+# Transactions and receipts mined in a final block are cached the same way
+TX_CACHE_SIZE = 10000
+
+# Several service calls ask for the tip within one page load; reuse the
+# answer for well under a block interval
+LATEST_BLOCK_TTL = 2.0
+
 class QuaiAPI:
     def __init__(self):
         self.api_key = os.getenv('QUAI_API_KEY')  # Reference wallet address
         self.rpc_url = "https://rpc.quai.network/cyprus1"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = self._build_session()
+        self._block_cache: OrderedDict = OrderedDict()
+        self._block_cache_max = BLOCK_CACHE_SIZE
+        self._tx_cache: OrderedDict = OrderedDict()
+        self._receipt_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._latest_seen: Optional[int] = None
+        self._latest_bn: Tuple[Optional[int], float] = (None, 0.0)
+        
+        # Set BLOCK_CACHE_PATH to an empty string to disable the disk cache.
+        # The file is opened lazily, so a preloaded master never holds it
+        disk_cache_path = os.getenv('BLOCK_CACHE_PATH', 'cache.db')
+        self.disk_cache_path = os.path.abspath(disk_cache_path) if disk_cache_path else None
+        self._disk_warmed_pid: Optional[int] = None
+
+    def _build_session(self) -> requests.Session:
+        """Create the pooled keep-alive session used for node calls"""
+        session = requests.Session()
+        session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'QuaiScan-Dashboard/1.0'
         })
+        session.mount('https://', HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=RPC_RETRY
+        ))
+        return session
+
+    def reset_session(self):
+        """Replace the session and disk cache connection, e.g. in a freshly forked worker"""
+        self.session.close()
+        self.session = self._build_session()
+        if self.disk_cache_path:
+            _close_disk_handle(self.disk_cache_path)
+            self._disk_warmed_pid = None
+
+    def _get_disk(self) -> Optional[Tuple[sqlite3.Connection, threading.Lock]]:
+        """Get the disk cache handle, warming the in-memory LRU on first use in this process"""
+        if not self.disk_cache_path:
+            return None
+        
+        try:
+            disk, lock = _shared_disk_handle(self.disk_cache_path)
+            if self._disk_warmed_pid != os.getpid():
+                self._disk_warmed_pid = os.getpid()
+                with lock:
+                    rows = disk.execute(
+                        "SELECT num, json FROM block_cache ORDER BY num DESC LIMIT ?", (WARM_START_BLOCKS,)
+                    ).fetchall()
+                # Oldest first, so the newest blocks end up most recently used
+                for block_number, blob in reversed(rows):
+                    self._cache_put(self._block_cache, block_number, json_loads(blob), self._block_cache_max)
+            return disk, lock
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Block disk cache unavailable, disabling it: {str(e)}")
+            self.disk_cache_path = None
+            return None
+
+    def _disk_get_blocks(self, block_numbers: List[int]) -> Dict[int, Dict]:
+        """Look up blocks in the disk cache, promoting hits into memory"""
+        handle = self._get_disk() if block_numbers else None
+        if handle is None:
+            return {}
+        
+        disk, lock = handle
+        try:
+            with lock:
+                rows = disk.execute(
+                    f"SELECT num, json FROM block_cache WHERE num IN ({','.join('?' * len(block_numbers))})",
+                    block_numbers
+                ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Block disk cache read failed: {str(e)}")
+            return {}
+        
+        blocks = {}
+        for block_number, blob in rows:
+            blocks[block_number] = json_loads(blob)
+            self._cache_put(self._block_cache, block_number, blocks[block_number], self._block_cache_max)
+        return blocks
+
+    def _disk_put_blocks(self, blocks: List[Tuple[int, Dict]]):
+        """Persist final blocks in one transaction, trimming the oldest past the size cap"""
+        handle = self._get_disk() if blocks else None
+        if handle is None:
+            return
+        
+        disk, lock = handle
+        try:
+            with lock, disk:
+                disk.executemany(
+                    "INSERT OR IGNORE INTO block_cache (num, json) VALUES (?, ?)",
+                    [(block_number, json_dumps(details)) for block_number, details in blocks]
+                )
+                disk.execute(
+                    "DELETE FROM block_cache WHERE num < "
+                    "(SELECT num FROM block_cache ORDER BY num DESC LIMIT 1 OFFSET ?)",
+                    (BLOCK_DISK_CACHE_SIZE - 1,)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Block disk cache write failed: {str(e)}")
 
     def _make_rpc_request(self, method: str, params: List = None) -> Optional[Dict]:
         """Make JSON-RPC request with error handling"""
@@ -30,7 +232,7 @@ class QuaiAPI:
             response = self.session.post(self.rpc_url, json=payload, timeout=10)
             response.raise_for_status()
             
-            data = response.json()
+            data = json_loads(response.content)
             
             if 'error' in data:
                 logger.error(f"RPC Error: {data['error']}")
@@ -45,6 +247,104 @@ class QuaiAPI:
             logger.error(f"JSON decode failed: {str(e)}")
             return None
 
+    def _make_batch_rpc_request(self, calls: List[Tuple[str, List]]) -> Optional[List[Optional[Dict]]]:
+        """Send several JSON-RPC calls in one HTTP request
+
+        Returns results in the order of `calls` (None for calls that errored).
+        Returns None only when the node explicitly rejects the batch with a
+        JSON-RPC error object, i.e. it does not support batching and the calls
+        should be retried one by one; if the node is unreachable, failing or
+        throttling, every result is None instead so callers don't multiply
+        requests against it.
+        """
+        failed = [None] * len(calls)
+        try:
+            payload = [
+                {"jsonrpc": "2.0", "method": method, "params": params or [], "id": i}
+                for i, (method, params) in enumerate(calls)
+            ]
+            
+            response = self.session.post(self.rpc_url, json=payload, timeout=10)
+            if response.status_code not in BATCH_REJECTION_STATUSES:
+                response.raise_for_status()
+            
+            data = json_loads(response.content)
+            
+            if isinstance(data, dict) and 'error' in data:
+                logger.error(f"RPC batch not supported: {data['error']}")
+                return None
+            if not isinstance(data, list):
+                logger.error(f"Unexpected RPC batch response: {data}")
+                return failed
+            
+            results = [None] * len(calls)
+            for item in data:
+                if 'error' in item:
+                    logger.error(f"RPC Error: {item['error']}")
+                    continue
+                request_id = item.get('id')
+                if isinstance(request_id, int) and 0 <= request_id < len(calls):
+                    results[request_id] = item.get('result')
+            return results
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Batch request failed: {str(e)}")
+            return failed
+        except ValueError as e:
+            logger.error(f"JSON decode failed: {str(e)}")
+            return failed
+
+    async def _rpc_async(self, client: httpx.AsyncClient, method: str, params: List = None) -> Optional[Dict]:
+        """Async counterpart of _make_rpc_request over a shared httpx client"""
+        try:
+            payload = {
+                "jsonrpc": "2.0",
+                "method": method,
+                "params": params or [],
+                "id": 1
+            }
+            
+            response = await client.post(self.rpc_url, json=payload)
+            response.raise_for_status()
+            
+            data = json_loads(response.content)
+            
+            if 'error' in data:
+                logger.error(f"RPC Error: {data['error']}")
+                return None
+                
+            return data.get('result')
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Request failed: {str(e)}")
+            return None
+        except ValueError as e:
+            logger.error(f"JSON decode failed: {str(e)}")
+            return None
+
+    async def get_blocks_details_async(self, block_numbers: List[int]) -> List[Optional[Dict]]:
+        """Fetch several blocks with concurrent requests, in the given order"""
+        # The client is bound to the running event loop, so build one per fan-out
+        async with httpx.AsyncClient(
+            http2=ASYNC_HTTP2,
+            timeout=10,
+            limits=httpx.Limits(max_connections=BLOCK_FETCH_WINDOW),
+            headers=self.session.headers
+        ) as client:
+            return list(await asyncio.gather(*[
+                self._rpc_async(client, "eth_getBlockByNumber", [hex(block_number), True])
+                for block_number in block_numbers
+            ]))
+
+    def _fetch_blocks_unbatched(self, block_numbers: List[int]) -> List[Optional[Dict]]:
+        """Fetch blocks one request each, concurrently"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.get_blocks_details_async(block_numbers))
+        # Already inside an event loop (can't nest asyncio.run) - use threads
+        return list(_block_fetch_pool.map(self.get_block_details, block_numbers))
+
     def get_wallet_balance(self, address: str) -> Optional[str]:
         """Get wallet balance in wei"""
         result = self._make_rpc_request("eth_getBalance", [address, "latest"])
@@ -60,17 +360,17 @@ class QuaiAPI:
             
         transactions = []
         blocks_to_check = min(offset * 10, 100)  # Check last 100 blocks max
+        block_nums = [latest_block - i for i in range(blocks_to_check)]
         
-        for i in range(blocks_to_check):
-            block_num = latest_block - i
-            block_details = self.get_block_details(block_num)
-            
+        for block_num, block_details in self.iter_blocks_details(block_nums):
             if block_details and 'transactions' in block_details:
                 for tx in block_details['transactions']:
                     if tx.get('from', '').lower() == address.lower() or tx.get('to', '').lower() == address.lower():
-                        # Add block number and timestamp to transaction
+                        # Add block number and timestamp to a copy, since
+                        # the block itself may be shared through the cache
+                        tx = dict(tx)
                         tx['blockNumber'] = hex(block_num)
-                        tx['timeStamp'] = str(int(block_details.get('timestamp', '0x0'), 16))
+                        tx['timeStamp'] = str(to_int(block_details.get('timestamp')))
                         transactions.append(tx)
                         
                         if len(transactions) >= offset:
@@ -80,26 +380,144 @@ class QuaiAPI:
 
     def get_latest_block_number(self) -> Optional[int]:
         """Get latest block number"""
+        value, fetched_at = self._latest_bn
+        if value is not None and time.monotonic() - fetched_at < LATEST_BLOCK_TTL:
+            return value
+        
         result = self._make_rpc_request("eth_blockNumber")
         
         if result:
             try:
-                return int(result, 16)
+                self._latest_seen = to_int(result)
+                self._latest_bn = (self._latest_seen, time.monotonic())
+                return self._latest_seen
             except ValueError:
                 return None
         return None
 
+    def _cache_get(self, cache: OrderedDict, key):
+        """Look up an LRU entry, marking it as recently used"""
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, cache: OrderedDict, key, value, max_size: int):
+        """Store an LRU entry, evicting the least recently used over max_size"""
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+
+    def _is_final(self, block_number: int) -> bool:
+        """Whether a block is deep enough below the tip to no longer be reorged"""
+        return self._latest_seen is not None and block_number <= self._latest_seen - REORG_SAFE_DEPTH
+
+    def _remember_blocks(self, blocks: List[Tuple[int, Optional[Dict]]]):
+        """Cache fetched blocks in memory and on disk once they are final"""
+        final_blocks = [(block_number, details) for block_number, details in blocks
+                        if details and self._is_final(block_number)]
+        for block_number, details in final_blocks:
+            self._cache_put(self._block_cache, block_number, details, self._block_cache_max)
+        self._disk_put_blocks(final_blocks)
+
+    def _remember_tx_item(self, cache: OrderedDict, tx_hash: str, item: Optional[Dict]):
+        """Cache a transaction or receipt once its block is final; pending ones have no blockNumber"""
+        block_number = item.get('blockNumber') if item else None
+        if not block_number:
+            return
+        try:
+            if self._is_final(to_int(block_number)):
+                self._cache_put(cache, tx_hash.lower(), item, TX_CACHE_SIZE)
+        except (ValueError, TypeError):
+            pass
+
     def get_block_details(self, block_number: int) -> Optional[Dict]:
         """Get block details by number"""
+        cached = self._cache_get(self._block_cache, block_number)
+        if cached is not None:
+            return cached
+        
+        stored = self._disk_get_blocks([block_number])
+        if block_number in stored:
+            return stored[block_number]
+        
         result = self._make_rpc_request("eth_getBlockByNumber", [hex(block_number), True])
+        self._remember_blocks([(block_number, result)])
         return result
 
+    def get_blocks_details(self, block_numbers: List[int]) -> List[Optional[Dict]]:
+        """Get details for several blocks in one batched call, in the given order"""
+        if not block_numbers:
+            return []
+        
+        # Serve finalized blocks from memory, then disk, and only fetch the rest
+        found = {n: self._cache_get(self._block_cache, n) for n in block_numbers}
+        missing = [n for n in block_numbers if found[n] is None]
+        found.update(self._disk_get_blocks(missing))
+        missing = [n for n in block_numbers if found[n] is None]
+        if missing:
+            results = self._make_batch_rpc_request(
+                [("eth_getBlockByNumber", [hex(block_number), True]) for block_number in missing]
+            )
+            if results is None:
+                # Node doesn't support batches - fetch the blocks concurrently instead
+                results = self._fetch_blocks_unbatched(missing)
+            for block_number, details in zip(missing, results):
+                found[block_number] = details
+            self._remember_blocks(list(zip(missing, results)))
+        
+        return [found[n] for n in block_numbers]
+
+    def iter_blocks_details(self, block_numbers: List[int]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """Yield (block_number, details) in order, fetching a window at a time
+
+        Callers that stop early never fetch blocks past the current window.
+        """
+        for start in range(0, len(block_numbers), BLOCK_FETCH_WINDOW):
+            window = block_numbers[start:start + BLOCK_FETCH_WINDOW]
+            yield from zip(window, self.get_blocks_details(window))
+
     def get_transaction_details(self, tx_hash: str) -> Optional[Dict]:
         """Get transaction details"""
+        cached = self._cache_get(self._tx_cache, tx_hash.lower())
+        if cached is not None:
+            return cached
+        
         result = self._make_rpc_request("eth_getTransactionByHash", [tx_hash])
+        self._remember_tx_item(self._tx_cache, tx_hash, result)
         return result
 
     def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
         """Get transaction receipt"""
+        cached = self._cache_get(self._receipt_cache, tx_hash.lower())
+        if cached is not None:
+            return cached
+        
         result = self._make_rpc_request("eth_getTransactionReceipt", [tx_hash])
-        return result
\ No newline at end of file
+        self._remember_tx_item(self._receipt_cache, tx_hash, result)
+        return result
+
+    def get_transaction_with_receipt(self, tx_hash: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        """Get transaction details and receipt in a single round trip"""
+        tx_details = self._cache_get(self._tx_cache, tx_hash.lower())
+        receipt = self._cache_get(self._receipt_cache, tx_hash.lower())
+        if tx_details is not None or receipt is not None:
+            # At most one lookup is left, so no batch is needed
+            return (tx_details or self.get_transaction_details(tx_hash),
+                    receipt or self.get_transaction_receipt(tx_hash))
+        
+        results = self._make_batch_rpc_request([
+            ("eth_getTransactionByHash", [tx_hash]),
+            ("eth_getTransactionReceipt", [tx_hash])
+        ])
+        
+        if results is None:
+            # Node doesn't support batches - fall back to individual calls
+            return self.get_transaction_details(tx_hash), self.get_transaction_receipt(tx_hash)
+        
+        self._remember_tx_item(self._tx_cache, tx_hash, results[0])
+        self._remember_tx_item(self._receipt_cache, tx_hash, results[1])
+        return results[0], results[1]
\ No newline at end of file
@@ -4,6 +4,7 @@ Dashboard Data Verification Script
 Verifies that Quai Dashboard is populated with real blockchain data
 """
 
+import asyncio
 import sys
 import os
 sys.path.append('.')
@@ -11,6 +12,14 @@ sys.path.append('.')
 from services.db import DatabaseService
 from datetime import datetime
 
+async def fetch_dashboard_data(db):
+    """Fetch network stats and the latest blocks/transactions concurrently"""
+    return await asyncio.gather(
+        asyncio.to_thread(db.get_network_stats),
+        # Blocks and transactions come from one sweep over the latest blocks
+        asyncio.to_thread(db.get_dashboard_snapshot, block_limit=5, tx_limit=5)
+    )
+
 def main():
     print("=" * 60)
     print("QUAI DASHBOARD DATA VERIFICATION")
@@ -23,10 +32,11 @@ def main():
     print(f"Reference Wallet: {db.reference_wallet}")
     print(f"RPC Endpoint: {db.quai_api.rpc_url}")
     
+    stats, snapshot = asyncio.run(fetch_dashboard_data(db))
+    
     # Test Network Stats
     print("\nNETWORK STATISTICS")
     print("-" * 30)
-    stats = db.get_network_stats()
     
     for key, value in stats.items():
         if key in ['total_blocks', 'total_transactions', 'active_addresses']:
@@ -38,7 +48,7 @@ def main():
     # Test Latest Blocks
     print("\nLATEST BLOCKS")
     print("-" * 30)
-    blocks = db.get_latest_blocks(limit=5)
+    blocks = snapshot['blocks']
     
     if blocks:
         for i, block in enumerate(blocks, 1):
@@ -54,7 +64,7 @@ def main():
     # Test Latest Transactions
     print("\nLATEST TRANSACTIONS")
     print("-" * 30)
-    txs = db.get_latest_transactions(limit=5)
+    txs = snapshot['transactions']
     
     if txs:
         for i, tx in enumerate(txs, 1):